@@ -7,8 +7,15 @@ Covers:
 - V2 "Sha1-Hulud: The Second Coming" fake Bun runtime (Nov 2025)
 """
 
+import mmap
+import os
 import re
 
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - optional speedup
+    ahocorasick = None
+
 # -----------------------------------------------------------------------------
 # File hashes
 # -----------------------------------------------------------------------------
@@ -28,59 +35,181 @@ SECOND_WAVE_BUN_HASHES = {
     ],
 }
 
+# Raw-digest forms for O(1) membership checks: consumers compare
+# hashlib .digest() bytes directly, skipping the hex encode (and the
+# per-list linear scan) on every hashed file.
+BUNDLE_DIGEST = bytes.fromhex(BUNDLE_HASH)
+
+SECOND_WAVE_BUN_DIGESTS = frozenset(
+    bytes.fromhex(h)
+    for hashes in SECOND_WAVE_BUN_HASHES.values()
+    for h in hashes
+)
+
 # -----------------------------------------------------------------------------
 # Suspicious lifecycle scripts (postinstall / preinstall)
 # -----------------------------------------------------------------------------
 # This is used against package.json install-time scripts. We keep the original
 # name (SUSPICIOUS_POSTINSTALL) for backwards compatibility, but it now
 # covers both postinstall and preinstall style payloads.
+#
+# The hot patterns are compiled WITHOUT re.IGNORECASE: case-folding every
+# input character on every regex step is pure overhead on multi-MB scans.
+# Instead the alternatives are written in lowercase and callers lowercase
+# the input once (see match_iocs / scan_iocs below).
+
+# The payload filenames share a factored "(node )?<name>.js" shape, so the
+# alternation stays small: fewer branches means a smaller compiled NFA and
+# shorter backtracking chains on non-matching input.
 
 SUSPICIOUS_POSTINSTALL = re.compile(
     r"("
-    r"node\s+bundle\.js|"          # V1 worm payload
-    r"node\s+setup_bun\.js|"       # V2 fake Bun runtime installer
-    r"setup_bun\.js|"              # direct execution
-    r"bun_environment\.js|"        # 10MB obfuscated Bun payload
+    r"(?:node\s+)?(?:bundle|setup_bun|bun_environment)\.js|"  # worm payloads (V1 bundle.js, V2 Bun runtime)
     r"trufflehog|"                 # abused secret scanner
     r"webhook\.site|"              # V1 exfil endpoint
     r"exfiltrat"                   # generic exfil keyword
-    r")",
-    re.IGNORECASE,
+    r")"
+)
+
+# Bytes twin so callers can scan files opened in 'rb' mode without paying
+# a whole-buffer UTF-8 decode first (see also SUSPICIOUS_IOCS_BYTES).
+SUSPICIOUS_POSTINSTALL_BYTES = re.compile(
+    SUSPICIOUS_POSTINSTALL.pattern.encode('ascii'), re.IGNORECASE
 )
 
 # -----------------------------------------------------------------------------
 # High-signal IoCs that can appear in files, scripts, or repo metadata
 # -----------------------------------------------------------------------------
 
+# Alternatives subsumed by a broader pattern are not repeated: e.g.
+# "shai[-_ ]?hulud" already matches shai-hulud-workflow.* and
+# "sha1[-_ ]?hulud" matches both the SHA1HULUD runner name and the
+# "Sha1-Hulud: The Second Coming" repo description prefix.
+
 SUSPICIOUS_IOCS = re.compile(
     r"("
     # Original wave (Sept 2025)
     r"webhook\.site|"                                  # exfil service
     r"bb8ca5f6-4175-45d2-b042-fc9ebb8170b7|"           # specific webhook ID
-    r"shai[-_ ]?hulud|"                                # generic Shai-Hulud markers
+    r"shai[-_ ]?hulud|"                                # Shai-Hulud markers + V1 workflow
     # Second wave (Nov 2025 - \"Sha1-Hulud: The Second Coming\")
-    r"sha1[-_ ]?hulud|"                                # new spelling / branding
-    r"Sha1-Hulud:\s*The Second Coming|"                # repo description
-    r"SHA1HULUD|"                                      # self-hosted runner name
+    r"sha1[-_ ]?hulud|"                                # branding / runner name / repo description
     # Malicious workflows and branches
-    r"shai-hulud-workflow\.ya?ml|"                     # V1 workflow
     r"\.github/workflows/discussion\.ya?ml|"           # V2 backdoor workflow
     r"\.github/workflows/formatter_[0-9]+\.ya?ml|"     # V2 exfil formatter workflow
     # Exfiltrated data files created by the worm
-    r"actionsSecrets\.json|"                           # GitHub secrets dump
-    r"truffleSecrets\.json|"                           # TruffleHog-discovered secrets
-    r"cloud\.json|"                                    # cloud secrets (AWS/GCP/Azure)
-    r"environment\.json|"                              # env vars from victim machine
-    r"contents\.json|"                                 # host info + GitHub token
+    r"(?:actions|truffle)secrets\.json|"               # GitHub / TruffleHog secrets dumps
+    r"(?:cloud|environment|contents)\.json|"           # cloud secrets, env vars, host info
     # Tooling / generic strings reused across waves
     r"trufflehog"                                      # abused for local secret scanning
-    r")",
-    re.IGNORECASE,
+    r")"
+)
+
+# 256-byte translation table so binary buffers can be lowercased with one
+# C-level bytes.translate call instead of a per-character Python loop.
+_LOWER_TABLE = bytes(range(256)).lower()
+
+# Bytes twin of SUSPICIOUS_IOCS for scanning mmap'd files without a decode
+# or lowercase copy; IGNORECASE on a bytes pattern is cheap ASCII folding.
+SUSPICIOUS_IOCS_BYTES = re.compile(SUSPICIOUS_IOCS.pattern.encode('ascii'), re.IGNORECASE)
+
+
+def scan_bytes(path):
+    """
+    Search a file for IoCs via mmap, zero-copy from the page cache.
+
+    Only the first MAX_FILE_SIZE bytes are mapped, so oversized files are
+    capped rather than read wholesale. Returns the matched IoC as a str,
+    or None if the file is clean or unreadable.
+    """
+    try:
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return None
+            with mmap.mmap(
+                f.fileno(), min(size, MAX_FILE_SIZE), access=mmap.ACCESS_READ
+            ) as mm:
+                match = SUSPICIOUS_IOCS_BYTES.search(mm)
+                if match:
+                    return match.group(0).decode('utf-8', errors='ignore')
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def match_iocs(text):
+    """
+    Case-insensitive SUSPICIOUS_IOCS search; lowercases the input once
+    instead of paying per-character case folding inside the regex engine.
+    """
+    if isinstance(text, bytes):
+        text = text.translate(_LOWER_TABLE).decode('utf-8', errors='ignore')
+    else:
+        text = text.lower()
+    return SUSPICIOUS_IOCS.search(text)
+
+# The IoC set above is almost entirely literal strings, so instead of walking
+# the regex alternation per input position we build a single Aho-Corasick
+# automaton and sweep the text once (O(N + matches)). The few fuzzy
+# `[-_ ]?` variants are pre-expanded into explicit literals so the automaton
+# covers 100% of the regex; SUSPICIOUS_IOCS stays as the fallback when
+# pyahocorasick is not installed.
+_IOC_NEEDLES = (
+    # Original wave (Sept 2025)
+    "webhook.site",
+    "bb8ca5f6-4175-45d2-b042-fc9ebb8170b7",
+    "shai-hulud", "shai_hulud", "shai hulud", "shaihulud",
+    # Second wave (Nov 2025)
+    "sha1-hulud", "sha1_hulud", "sha1 hulud", "sha1hulud",
+    # Malicious workflows and branches (shai-hulud-workflow.* is already
+    # covered by the "shai-hulud" needle)
+    ".github/workflows/discussion.yml",
+    ".github/workflows/discussion.yaml",
+    ".github/workflows/formatter_",
+    # Exfiltrated data files created by the worm
+    "actionssecrets.json",
+    "trufflesecrets.json",
+    "cloud.json",
+    "environment.json",
+    "contents.json",
+    # Tooling / generic strings reused across waves
+    "trufflehog",
 )
 
-# Convenience lists for any future heuristics (not required by existing code,
-# but useful to have centralised here).
-SUSPICIOUS_FILENAMES = [
+if ahocorasick is not None:
+    SUSPICIOUS_IOC_AC = ahocorasick.Automaton()
+    for _needle in _IOC_NEEDLES:
+        SUSPICIOUS_IOC_AC.add_word(_needle, _needle)
+    SUSPICIOUS_IOC_AC.make_automaton()
+else:
+    SUSPICIOUS_IOC_AC = None
+
+
+def scan_iocs(text):
+    """
+    Return True if any known IoC literal occurs in text (str or bytes).
+
+    Uses the Aho-Corasick automaton when available (single linear pass),
+    falling back to the SUSPICIOUS_IOCS regex otherwise.
+    """
+    if isinstance(text, bytes):
+        text = text.translate(_LOWER_TABLE).decode('utf-8', errors='ignore')
+    else:
+        text = text.lower()
+
+    if SUSPICIOUS_IOC_AC is not None:
+        for _ in SUSPICIOUS_IOC_AC.iter(text):
+            return True
+        return False
+
+    return SUSPICIOUS_IOCS.search(text) is not None
+
+
+# Convenience sets for any future heuristics (not required by existing code,
+# but useful to have centralised here). frozenset gives O(1) membership
+# tests inside directory-walk loops.
+SUSPICIOUS_FILENAMES = frozenset({
     "bundle.js",
     "setup_bun.js",
     "bun_environment.js",
@@ -91,8 +220,17 @@ SUSPICIOUS_FILENAMES = [
     "actionsSecrets.json",
     "shai-hulud-workflow.yml",
     "shai-hulud-workflow.yaml",
+    "discussion.yml",
     "discussion.yaml",
-]
+})
+
+# Extension-agnostic workflow check: callers test Path(name).stem against
+# this and the suffix against ('.yml', '.yaml') instead of listing every
+# yml/yaml spelling above.
+SUSPICIOUS_WORKFLOW_STEMS = frozenset({
+    "shai-hulud-workflow",
+    "discussion",
+})
 
 SUSPICIOUS_WORKFLOW_PATTERNS = re.compile(
     r"\.github/workflows/(?:"
@@ -103,6 +241,40 @@ SUSPICIOUS_WORKFLOW_PATTERNS = re.compile(
     re.IGNORECASE,
 )
 
+SUSPICIOUS_WORKFLOW_PATTERNS_BYTES = re.compile(
+    SUSPICIOUS_WORKFLOW_PATTERNS.pattern.encode('ascii'), re.IGNORECASE
+)
+
+# All three detection families fused into one alternation: a caller that
+# wants every category of hit sweeps the buffer once instead of running
+# three separate engine passes over the same bytes.
+# The workflow group precedes the ioc group because SUSPICIOUS_IOCS also
+# matches workflow paths; more specific first gives the better category.
+_ALL_MALICIOUS_RE = re.compile(
+    f"(?P<postinstall>{SUSPICIOUS_POSTINSTALL.pattern})"
+    f"|(?P<workflow>{SUSPICIOUS_WORKFLOW_PATTERNS.pattern})"
+    f"|(?P<ioc>{SUSPICIOUS_IOCS.pattern})",
+    re.IGNORECASE,
+)
+
+_ALL_CATEGORIES = ('postinstall', 'workflow', 'ioc')
+
+
+def scan_all(text):
+    """
+    Yield (category, match) for every suspicious hit in text, one pass.
+
+    category is 'postinstall', 'ioc' or 'workflow', matching the family
+    of pattern that fired; match is the underlying re.Match.
+    """
+    if isinstance(text, bytes):
+        text = text.decode('utf-8', errors='ignore')
+    for match in _ALL_MALICIOUS_RE.finditer(text):
+        for category in _ALL_CATEGORIES:
+            if match.group(category) is not None:
+                yield category, match
+                break
+
 # -----------------------------------------------------------------------------
 # Scanner metadata / settings
 # -----------------------------------------------------------------------------
@@ -6,6 +6,8 @@ Dependency scanner for Shai-Hulud Scanner
 import json
 import os
 from pathlib import Path
+from ..constants import scan_iocs
+from ..utils.bloom import build_bloom, bloom_contains
 from ..utils.lockfile_parser import parse_lockfile, clean_version
 from ..utils.logger import log
 
@@ -47,19 +49,33 @@ def scan_dependencies(directory, bad_packages, is_json=False):
         if name in bad_packages and cleaned_version in bad_packages[name]:
             results['badDeps'].append({'name': name, 'version': cleaned_version})
     
-    # Check lockfile (ALL packages, not just those in package.json)
-    lockfile_deps = parse_lockfile(directory)
+    # Check lockfile (ALL packages, not just those in package.json).
+    # The badlist check and the IoC name check run inside the parse pass
+    # via the sink, so the dependency stream is walked exactly once. The
+    # Bloom filter rejects almost every clean name before the dict
+    # lookup, which matters when the badlist is large.
+    bad_bloom = build_bloom(bad_packages)
     unique_lockfile_deps = set()
-    
-    for dep in lockfile_deps:
-        name = dep['name']
-        version = dep['version']
+    bad_deps = results['badDeps']
+    seen_bad = {(d['name'], d['version']) for d in bad_deps}
+
+    def check_dep(dep):
+        name = dep.name
+        version = dep.version
         unique_lockfile_deps.add(name)
-        
-        if name in bad_packages and version in bad_packages[name]:
-            # Always add vulnerable packages from lockfile, regardless of package.json
-            if not any(d['name'] == name and d['version'] == version for d in results['badDeps']):
-                results['badDeps'].append({'name': name, 'version': version})
+
+        # Always add vulnerable packages from lockfile, regardless of package.json
+        is_bad = (
+            bloom_contains(bad_bloom, name)
+            and name in bad_packages
+            and version in bad_packages[name]
+        )
+        # Packages whose name itself is a Shai-Hulud IoC are flagged too
+        if (is_bad or scan_iocs(name)) and (name, version) not in seen_bad:
+            seen_bad.add((name, version))
+            bad_deps.append({'name': name, 'version': version})
+
+    parse_lockfile(directory, sink=check_dep)
     
     # Total scanned = direct deps + unique lockfile deps (transitive)
     results['totalScanned'] = max(direct_deps_count, len(unique_lockfile_deps))
@@ -3,13 +3,13 @@
 File scanner for Shai-Hulud Scanner
 """
 
-import hashlib
 import json
 import os
 import re
 from pathlib import Path
 from glob import glob
-from ..constants import BUNDLE_HASH, SUSPICIOUS_POSTINSTALL, SUSPICIOUS_IOCS, MAX_FILE_SIZE
+from ..constants import BUNDLE_DIGEST, SUSPICIOUS_POSTINSTALL, MAX_FILE_SIZE, match_iocs
+from ..utils.hashing import hash_file
 from ..utils.logger import log
 
 def scan_files(directory, is_json=False):
@@ -37,16 +37,13 @@ def scan_files(directory, is_json=False):
             file_path_obj = Path(file_path)
             if file_path_obj.stat().st_size > MAX_FILE_SIZE:
                 continue  # Skip very large files
-            
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            
-            file_hash = hashlib.sha256(content).hexdigest()
-            if file_hash == BUNDLE_HASH:
+
+            file_digest = hash_file(file_path, 'sha256')
+            if file_digest == BUNDLE_DIGEST:
                 issue = {
                     'type': 'bundle.js',
                     'path': file_path,
-                    'hash': file_hash
+                    'hash': file_digest.hex()
                 }
                 results['suspiciousFiles'].append(issue)
                 # Silently add to results - UI will handle display
@@ -66,7 +63,7 @@ def scan_files(directory, is_json=False):
             # Check postinstall scripts
             scripts = pkg.get('scripts', {})
             postinstall = scripts.get('postinstall', '')
-            if postinstall and SUSPICIOUS_POSTINSTALL.search(postinstall):
+            if postinstall and SUSPICIOUS_POSTINSTALL.search(postinstall.lower()):
                 results['suspiciousScripts'].append({
                     'path': file_path,
                     'script': postinstall
@@ -76,7 +73,7 @@ def scan_files(directory, is_json=False):
             
             # Check for suspicious IOCs in package content
             content = json.dumps(pkg)
-            ioc_match = SUSPICIOUS_IOCS.search(content)
+            ioc_match = match_iocs(content)
             if ioc_match:
                 results['suspiciousFiles'].append({
                     'type': 'IOC',
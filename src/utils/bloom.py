@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tiny Bloom filter over package names for Shai-Hulud Scanner
+
+A 128KB bitmap answers "definitely not in the badlist" for the vast
+majority of clean dependencies before the scanner falls back to the
+authoritative dict lookup, keeping the hot path in cache on large
+lockfiles. Uses Python's builtin hash (stable within a process, which
+is all a per-run filter needs) split into two probe positions.
+"""
+
+_BLOOM_BITS = 1 << 20
+_BLOOM_MASK = _BLOOM_BITS - 1
+
+
+def build_bloom(names):
+    """Build a bitmap Bloom filter from an iterable of package names"""
+    bitmap = bytearray(_BLOOM_BITS >> 3)
+    for name in names:
+        h = hash(name)
+        for idx in (h & _BLOOM_MASK, (h >> 20) & _BLOOM_MASK):
+            bitmap[idx >> 3] |= 1 << (idx & 7)
+    return bitmap
+
+
+def bloom_contains(bitmap, name):
+    """
+    Test a name against the filter. False means definitely absent;
+    True means probably present and must be confirmed against the set.
+    """
+    h = hash(name)
+    idx1 = h & _BLOOM_MASK
+    idx2 = (h >> 20) & _BLOOM_MASK
+    return (
+        bitmap[idx1 >> 3] >> (idx1 & 7) & 1
+        and bitmap[idx2 >> 3] >> (idx2 & 7) & 1
+    )
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+File hashing utilities for Shai-Hulud Scanner
+"""
+
+import hashlib
+
+def hash_file(path, algo='sha256'):
+    """
+    Compute the raw digest of a file.
+
+    Uses hashlib.file_digest (Python 3.11+), which hashes through a
+    reusable buffer entirely in C (and OpenSSL's hardware SHA path where
+    available), falling back to a chunked update loop on older
+    interpreters. Returns digest bytes for direct comparison against
+    the digest constants in constants.py.
+    """
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, algo).digest()
+
+        digest = hashlib.new(algo)
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+        return digest.digest()
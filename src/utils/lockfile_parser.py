@@ -3,86 +3,174 @@
 Lockfile parsing utilities for different package managers
 """
 
+import functools
 import json
 import os
 import re
-from pathlib import Path
+from collections import namedtuple
 
 import yaml
 
+# ijson streams the npm v7+ "packages" map entry by entry, so a 100MB
+# package-lock.json never has its whole object graph materialized.
+try:
+    import ijson
+    _NPM_PARSE_ERRORS = (ValueError, FileNotFoundError, KeyError, ijson.JSONError)
+except ImportError:  # pragma: no cover - optional speedup
+    ijson = None
+    _NPM_PARSE_ERRORS = (ValueError, FileNotFoundError, KeyError)
+
+# orjson parses bytes directly through a SIMD-accelerated core, 2-5x
+# faster than stdlib json on typical lockfiles.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# Below this size a full orjson/json parse beats streaming; above it,
+# ijson's O(1) memory profile wins.
+_STREAM_THRESHOLD = 5 * 1024 * 1024
+
+# libyaml's C loader parses multi-MB pnpm/yarn lockfiles 5-10x faster than
+# the pure-Python SafeLoader; fall back when PyYAML was built without it.
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
 from .logger import log
 
+# Lightweight wire format for parsed dependencies. A 2-tuple is ~4x smaller
+# than the {'name': ..., 'version': ...} dict it replaces, which matters when
+# a monorepo lockfile yields tens of thousands of entries.
+Dep = namedtuple('Dep', 'name version')
+
 YARN_BERRY_PROTOCOL_RE = re.compile(
     r'^(?P<name>(?:@[^/@]+/)?[^@/]+)@(?:npm|patch|workspace|link|file|exec|git|http|https):'
 )
 
-def parse_lockfile(directory):
+# Compiled once at import so scanning a monorepo with many lockfiles does
+# not recompile these per call.
+_YARN_CLASSIC_RE = re.compile(
+    r'^"?([^@\s]+)@[^"]*"?:\s*\n(?:[ \t]+.*\n)*?[ \t]+version\s+"([^"]+)"',
+    re.MULTILINE,
+)
+
+_VERSION_PREFIX_RE = re.compile(r'^[^\d]+')
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_cached(path_str, lockfile_name, mtime_ns, size):
+    """
+    Parse a lockfile once per (path, mtime, size) so repeated scans of the
+    same tree don't re-read and re-parse unchanged files. mtime_ns/size are
+    part of the cache key purely for invalidation: editing the file changes
+    them and naturally busts the stale entry.
+
+    Returns a tuple of Dep entries so the result is hashable.
+    """
+    return tuple(_PARSERS[lockfile_name](path_str))
+
+def parse_lockfile(directory, sink=None):
     """
     Parse lockfiles for npm, Yarn, and PNPM to extract dependencies
-    Returns list of {name, version} dictionaries
+    Returns list of Dep(name, version) namedtuples
+
+    When sink is given, each Dep is handed to sink(dep) as it is produced
+    instead of accumulating a merged list (returns None in that mode), so
+    callers can fuse their per-dependency checks into this single pass.
     """
-    dependencies = []
-    dir_path = Path(directory)
-    
-    # Try npm package-lock.json
-    npm_lock = dir_path / 'package-lock.json'
-    if npm_lock.exists():
-        dependencies.extend(parse_npm_lockfile(npm_lock))
-    
-    # Try Yarn yarn.lock
-    yarn_lock = dir_path / 'yarn.lock'
-    if yarn_lock.exists():
-        dependencies.extend(parse_yarn_lockfile(yarn_lock))
-    
-    # Try PNPM pnpm-lock.yaml
-    pnpm_lock = dir_path / 'pnpm-lock.yaml'
-    if pnpm_lock.exists():
-        dependencies.extend(parse_pnpm_lockfile(pnpm_lock))
-    
+    dependencies = [] if sink is None else None
+
+    # One scandir reads the directory once instead of a stat syscall per
+    # candidate lockfile (3x the metadata cost on network filesystems).
+    try:
+        with os.scandir(directory) as entries:
+            names = {e.name: e.path for e in entries if e.is_file()}
+    except OSError:
+        return dependencies
+
+    for lockfile_name in ('package-lock.json', 'yarn.lock', 'pnpm-lock.yaml'):
+        path = names.get(lockfile_name)
+        if path is None:
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        deps = _parse_cached(path, lockfile_name, stat.st_mtime_ns, stat.st_size)
+        if sink is not None:
+            for dep in deps:
+                sink(dep)
+        else:
+            dependencies.extend(deps)
+
     return dependencies
 
 def parse_npm_lockfile(lockfile_path):
     """Parse npm package-lock.json"""
     dependencies = []
-    
+
     try:
-        with open(lockfile_path, 'r', encoding='utf-8') as f:
-            lock_data = json.load(f)
-        
-        # Handle different package-lock.json formats
+        # Very large lockfiles: stream the v7+ 'packages' map so peak
+        # memory stays O(1) instead of materializing the object graph.
+        if ijson is not None and os.path.getsize(lockfile_path) >= _STREAM_THRESHOLD:
+            with open(lockfile_path, 'rb') as f:
+                dependencies = [
+                    Dep(name, package_info.get('version', '0.0.0'))
+                    for package_path, package_info in ijson.kvitems(f, 'packages')
+                    # Skip the root package ('' key) and bare node_modules/ paths
+                    if package_path
+                    and (name := package_path.rsplit('node_modules/', 1)[-1])
+                ]
+
+            if dependencies:
+                return dependencies
+
+        # Common case: full parse, via orjson (accepts bytes, no Python-
+        # level UTF-8 decode) when available.
+        with open(lockfile_path, 'rb') as f:
+            raw = f.read()
+        lock_data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
         if 'packages' in lock_data:
-            # npm v7+ format
-            for package_path, package_info in lock_data['packages'].items():
-                if package_path == '':  # Skip root package
-                    continue
-                
-                name = package_path.split('node_modules/')[-1]
-                version = package_info.get('version', '0.0.0')
-                
-                if name and version:
-                    dependencies.append({'name': name, 'version': version})
-        
+            # npm v7+ format; comprehension keeps the per-entry work in a
+            # tight LIST_APPEND loop rather than repeated method calls
+            dependencies = [
+                Dep(name, package_info.get('version', '0.0.0'))
+                for package_path, package_info in lock_data['packages'].items()
+                # Skip the root package ('' key) and bare node_modules/ paths
+                if package_path
+                and (name := package_path.rsplit('node_modules/', 1)[-1])
+            ]
+
         elif 'dependencies' in lock_data:
             # npm v6 format
             dependencies.extend(extract_npm_v6_deps(lock_data['dependencies']))
-        
-    except (json.JSONDecodeError, FileNotFoundError, KeyError) as e:
+
+    except _NPM_PARSE_ERRORS as e:
         log.debug(f"Failed to parse npm lockfile {lockfile_path}: {e}")
-    
+
     return dependencies
 
 def extract_npm_v6_deps(deps_dict):
-    """Recursively extract dependencies from npm v6 format"""
+    """
+    Extract dependencies from the nested npm v6 format.
+
+    Iterative worklist rather than recursion: no Python frame allocation
+    per tree node and no RecursionError on pathologically deep trees.
+    """
     dependencies = []
-    
-    for name, info in deps_dict.items():
-        version = info.get('version', '0.0.0')
-        dependencies.append({'name': name, 'version': version})
-        
-        # Recursively process nested dependencies
-        if 'dependencies' in info:
-            dependencies.extend(extract_npm_v6_deps(info['dependencies']))
-    
+    stack = [deps_dict]
+
+    while stack:
+        current = stack.pop()
+        for name, info in current.items():
+            dependencies.append(Dep(name, info.get('version', '0.0.0')))
+            nested = info.get('dependencies')
+            if nested:
+                stack.append(nested)
+
     return dependencies
 
 def parse_yarn_lockfile(lockfile_path):
@@ -93,15 +181,21 @@ def parse_yarn_lockfile(lockfile_path):
     except FileNotFoundError:
         return []
 
-    # Yarn Berry (2+) uses strict YAML with __metadata section
-    try:
-        lock_data = yaml.safe_load(content)
-        if isinstance(lock_data, dict) and any(
-            meta_key in lock_data for meta_key in ('__metadata', '__metadata__')
-        ):
-            return _parse_yarn_berry_lock(lock_data)
-    except yaml.YAMLError:
-        pass
+    # Yarn Berry (2+) uses strict YAML with a __metadata section near the
+    # top of the file. Sniff the first few KB for it before committing to
+    # a YAML parse, so large Yarn 1 lockfiles are never fully YAML-parsed
+    # just to discover they are not Berry.
+    head = content[:4096]
+    is_berry = head.startswith('__metadata') or '\n__metadata' in head
+    if is_berry:
+        try:
+            lock_data = yaml.load(content, Loader=_SafeLoader)
+            if isinstance(lock_data, dict) and any(
+                meta_key in lock_data for meta_key in ('__metadata', '__metadata__')
+            ):
+                return _parse_yarn_berry_lock(lock_data)
+        except yaml.YAMLError:
+            pass
 
     # Fallback to Yarn classic parser
     return _parse_yarn_classic_lock(content)
@@ -109,11 +203,7 @@ def parse_yarn_lockfile(lockfile_path):
 
 def _parse_yarn_classic_lock(content):
     """Parse Yarn 1.x lockfiles that use the legacy format"""
-    pattern = re.compile(
-        r'^"?([^@\s]+)@[^"]*"?:\s*\n(?:[ \t]+.*\n)*?[ \t]+version\s+"([^"]+)"',
-        re.MULTILINE,
-    )
-    return [{'name': name, 'version': version} for name, version in pattern.findall(content)]
+    return [Dep(name, version) for name, version in _YARN_CLASSIC_RE.findall(content)]
 
 
 def _parse_yarn_berry_lock(lock_data):
@@ -132,15 +222,31 @@ def _parse_yarn_berry_lock(lock_data):
         if not name:
             continue
 
-        dependencies.append({'name': name, 'version': str(version)})
+        dependencies.append(Dep(name, str(version)))
     return dependencies
 
 
+# Protocol markers for the partition-based fast path below, ordered by
+# how common they are in real Berry lockfiles.
+_YARN_BERRY_PROTOCOLS = (
+    '@npm:', '@workspace:', '@patch:', '@link:', '@file:',
+    '@exec:', '@git:', '@https:', '@http:',
+)
+
+
 def _extract_yarn_berry_name(descriptor):
     """
     Extract package name from a Yarn 2 descriptor (may contain multiple descriptors separated by commas)
     """
-    first_descriptor = descriptor.split(',')[0].strip().strip('"').strip("'")
+    first_descriptor = descriptor.partition(',')[0].strip().strip('"').strip("'")
+
+    # Fast path: the overwhelmingly common '<name>@<protocol>:' shape is
+    # resolved with str.partition, several times cheaper than the regex.
+    for protocol in _YARN_BERRY_PROTOCOLS:
+        head, sep, _ = first_descriptor.partition(protocol)
+        if sep and head:
+            return head
+
     match = YARN_BERRY_PROTOCOL_RE.match(first_descriptor)
     if match:
         return match.group('name')
@@ -161,28 +267,32 @@ def parse_pnpm_lockfile(lockfile_path):
     
     try:
         with open(lockfile_path, 'r', encoding='utf-8') as f:
-            lock_data = yaml.safe_load(f)
+            lock_data = yaml.load(f, Loader=_SafeLoader)
         
-        # PNPM stores dependencies in 'packages' section
+        # PNPM stores dependencies in 'packages' section.
+        # Spec format: /package/version or /package/version_hash;
+        # split('_', 1) stops at the first underscore of the hash suffix.
         packages = lock_data.get('packages', {})
-        
-        for package_spec, package_info in packages.items():
-            # Package spec format: /package/version or /package/version_hash
-            if package_spec.startswith('/'):
-                parts = package_spec[1:].split('/')
-                if len(parts) >= 2:
-                    name = '/'.join(parts[:-1])
-                    version_part = parts[-1]
-                    # Extract version (remove hash if present)
-                    version = version_part.split('_')[0]
-                    
-                    dependencies.append({'name': name, 'version': version})
-    
+
+        dependencies = [
+            Dep('/'.join(parts[:-1]), parts[-1].split('_', 1)[0])
+            for package_spec in packages
+            if package_spec.startswith('/')
+            and len(parts := package_spec[1:].split('/')) >= 2
+        ]
+
     except (yaml.YAMLError, FileNotFoundError, KeyError) as e:
         log.debug(f"Failed to parse PNPM lockfile {lockfile_path}: {e}")
     
     return dependencies
 
+# Dispatch table for _parse_cached (defined after the parsers it references)
+_PARSERS = {
+    'package-lock.json': parse_npm_lockfile,
+    'yarn.lock': parse_yarn_lockfile,
+    'pnpm-lock.yaml': parse_pnpm_lockfile,
+}
+
 def clean_version(version):
     """Clean version string by removing prefixes like ^, ~, etc."""
-    return re.sub(r'^[^\d]+', '', version)
+    return _VERSION_PREFIX_RE.sub('', version)